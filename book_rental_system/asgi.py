@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'book_rental_system.settings')
+# Tells settings to disable persistent DB connections (see DATABASES)
+os.environ['BOOK_RENTAL_ASGI'] = '1'
 
 application = get_asgi_application()
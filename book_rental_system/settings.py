@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'rentals.middleware.AdminFlagMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -77,6 +79,18 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests instead of reconnecting each time.
+        # Each worker thread/process holds its own connection for up to this many
+        # seconds, so size the database's max connections (or a pooler such as
+        # pgbouncer in transaction mode) for the total worker count.
+        # Under ASGI each request's sync code runs in a fresh thread, so a
+        # persistent connection is never reused and is not closed when the
+        # request ends (Django ticket #33497); asgi.py turns them off there.
+        'CONN_MAX_AGE': 0 if os.environ.get('BOOK_RENTAL_ASGI') else 600,
+        # Verify a reused connection is still alive before the request uses it
+        'CONN_HEALTH_CHECKS': True,
+        # Leave TEST NAME unset: the test runner then builds the SQLite test
+        # database in memory (and clones it in memory for parallel workers)
     }
 }
 
@@ -15,16 +15,13 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, reverse_lazy
 from django.contrib.auth import views as auth_views
-from django.shortcuts import redirect
-
-def admin_redirect(request):
-    """Redirect /admin/ to custom admin dashboard"""
-    return redirect('admin_dashboard')
+from django.views.generic import RedirectView
 
 urlpatterns = [
-    path('admin/', admin_redirect),  # Redirect to custom admin
+    # Redirect to custom admin
+    path('admin/', RedirectView.as_view(url=reverse_lazy('admin_dashboard'))),
     path('django-admin/', admin.site.urls),  # Keep Django admin as backup
     path('', include('rentals.urls')),
     path('login/', auth_views.LoginView.as_view(template_name='rentals/login.html'), name='login'),
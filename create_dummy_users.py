@@ -16,54 +16,86 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'book_rental_system.settings')
 django.setup()
 
 from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
 from rentals.models import Book
 from decimal import Decimal
 
 
+USER_DATA = (
+    ('alice_wonder', 'Alice', 'Wonder'),
+    ('bob_builder', 'Bob', 'Builder'),
+    ('charlie_brown', 'Charlie', 'Brown'),
+    ('diana_prince', 'Diana', 'Prince'),
+    ('edward_stark', 'Edward', 'Stark'),
+    ('fiona_apple', 'Fiona', 'Apple'),
+    ('george_martin', 'George', 'Martin'),
+    ('hannah_montana', 'Hannah', 'Montana'),
+    ('ivan_terrible', 'Ivan', 'Terrible'),
+    ('julia_child', 'Julia', 'Child'),
+    ('kevin_hart', 'Kevin', 'Hart'),
+    ('lisa_simpson', 'Lisa', 'Simpson'),
+    ('michael_scott', 'Michael', 'Scott'),
+    ('nancy_drew', 'Nancy', 'Drew'),
+    ('oliver_twist', 'Oliver', 'Twist'),
+)
+
+BOOKS_DATA = (
+    ("The Great Adventure", "John Smith", "ADV001", 450),
+    ("Mystery of the Old House", "Jane Doe", "MYS002", 320),
+    ("Science for Beginners", "Dr. Albert", "SCI003", 280),
+    ("History of Ancient Rome", "Marcus Julius", "HIS004", 520),
+    ("Programming Basics", "Tech Guru", "PRG005", 380),
+    ("Cooking Masterclass", "Chef Gordon", "COK006", 240),
+    ("Travel Guide Europe", "Explorer Jane", "TRV007", 410),
+    ("Mathematics Advanced", "Prof. Newton", "MTH008", 560),
+    ("Art of Photography", "Camera Man", "ART009", 290),
+    ("Business Strategy", "MBA Expert", "BUS010", 350),
+    ("Digital Marketing", "Social Media Pro", "MKT011", 310),
+    ("Psychology Basics", "Dr. Mind", "PSY012", 420),
+    ("Physics for Everyone", "Einstein Jr", "PHY013", 480),
+    ("Creative Writing", "Author Best", "WRT014", 270),
+    ("Financial Freedom", "Money Guru", "FIN015", 390),
+)
+
+
 def create_users(count=5):
     """Create dummy student users"""
     print(f"\n{'='*60}")
     print(f"👥 CREATING {count} DUMMY USERS")
     print('='*60)
     
-    user_data = [
-        ('alice_wonder', 'Alice', 'Wonder'),
-        ('bob_builder', 'Bob', 'Builder'),
-        ('charlie_brown', 'Charlie', 'Brown'),
-        ('diana_prince', 'Diana', 'Prince'),
-        ('edward_stark', 'Edward', 'Stark'),
-        ('fiona_apple', 'Fiona', 'Apple'),
-        ('george_martin', 'George', 'Martin'),
-        ('hannah_montana', 'Hannah', 'Montana'),
-        ('ivan_terrible', 'Ivan', 'Terrible'),
-        ('julia_child', 'Julia', 'Child'),
-        ('kevin_hart', 'Kevin', 'Hart'),
-        ('lisa_simpson', 'Lisa', 'Simpson'),
-        ('michael_scott', 'Michael', 'Scott'),
-        ('nancy_drew', 'Nancy', 'Drew'),
-        ('oliver_twist', 'Oliver', 'Twist'),
-    ]
+    selected = USER_DATA[:count]
+    existing = set(
+        User.objects.filter(username__in=[u[0] for u in selected])
+        .values_list('username', flat=True)
+    )
     
-    created_count = 0
-    for i in range(min(count, len(user_data))):
-        username, first_name, last_name = user_data[i]
-        
-        if User.objects.filter(username=username).exists():
-            print(f"⚠️  {username:20} - Already exists")
+    # Hash the shared password once instead of once per user
+    password = make_password('student123')
+    new_users = []
+    lines = []  # buffered so the loop costs one write instead of one per row
+    for username, first_name, last_name in selected:
+        if username in existing:
+            lines.append(f"⚠️  {username:20} - Already exists\n")
         else:
-            user = User.objects.create_user(
+            new_users.append(User(
                 username=username,
-                password='student123',
+                password=password,
                 first_name=first_name,
                 last_name=last_name
-            )
-            print(f"✅ {username:20} - Created ({first_name} {last_name})")
-            created_count += 1
+            ))
+            lines.append(f"✅ {username:20} - Created ({first_name} {last_name})\n")
     
-    print('='*60)
-    print(f"✅ Created {created_count} new users")
-    print(f"📝 All users have password: student123")
-    print('='*60)
+    User.objects.bulk_create(new_users, batch_size=1000)
+    created_count = len(new_users)
+    
+    lines.append(
+        f"{'='*60}\n"
+        f"✅ Created {created_count} new users\n"
+        f"📝 All users have password: student123\n"
+        f"{'='*60}\n"
+    )
+    sys.stdout.write(''.join(lines))
 
 
 def create_books(count=5):
@@ -72,44 +104,37 @@ def create_books(count=5):
     print(f"📚 CREATING {count} DUMMY BOOKS")
     print('='*60)
     
-    books_data = [
-        ("The Great Adventure", "John Smith", "ADV001", 450),
-        ("Mystery of the Old House", "Jane Doe", "MYS002", 320),
-        ("Science for Beginners", "Dr. Albert", "SCI003", 280),
-        ("History of Ancient Rome", "Marcus Julius", "HIS004", 520),
-        ("Programming Basics", "Tech Guru", "PRG005", 380),
-        ("Cooking Masterclass", "Chef Gordon", "COK006", 240),
-        ("Travel Guide Europe", "Explorer Jane", "TRV007", 410),
-        ("Mathematics Advanced", "Prof. Newton", "MTH008", 560),
-        ("Art of Photography", "Camera Man", "ART009", 290),
-        ("Business Strategy", "MBA Expert", "BUS010", 350),
-        ("Digital Marketing", "Social Media Pro", "MKT011", 310),
-        ("Psychology Basics", "Dr. Mind", "PSY012", 420),
-        ("Physics for Everyone", "Einstein Jr", "PHY013", 480),
-        ("Creative Writing", "Author Best", "WRT014", 270),
-        ("Financial Freedom", "Money Guru", "FIN015", 390),
-    ]
+    selected = BOOKS_DATA[:count]
+    existing = set(
+        Book.objects.filter(isbn__in=[b[2] for b in selected])
+        .values_list('isbn', flat=True)
+    )
     
-    created_count = 0
-    for i in range(min(count, len(books_data))):
-        title, author, isbn, pages = books_data[i]
-        monthly_fee = Decimal(str(pages / 100))
+    new_books = []
+    lines = []  # buffered so the loop costs one write instead of one per row
+    for title, author, isbn, pages in selected:
+        monthly_fee = Decimal(pages) / Decimal(100)
         
-        if Book.objects.filter(isbn=isbn).exists():
-            print(f"⚠️  {title:30} - Already exists")
+        if isbn in existing:
+            lines.append(f"⚠️  {title:30} - Already exists\n")
         else:
-            book = Book.objects.create(
+            new_books.append(Book(
                 title=title,
                 author=author,
                 isbn=isbn,
                 number_of_pages=pages
-            )
-            print(f"✅ {title:30} - {pages:3} pages (${monthly_fee}/mo)")
-            created_count += 1
+            ))
+            lines.append(f"✅ {title:30} - {pages:3} pages (${monthly_fee}/mo)\n")
     
-    print('='*60)
-    print(f"✅ Created {created_count} new books")
-    print('='*60)
+    Book.objects.bulk_create(new_books, batch_size=1000)
+    created_count = len(new_books)
+    
+    lines.append(
+        f"{'='*60}\n"
+        f"✅ Created {created_count} new books\n"
+        f"{'='*60}\n"
+    )
+    sys.stdout.write(''.join(lines))
 
 
 def create_admin():
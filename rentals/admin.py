@@ -1,11 +1,19 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
 from django.contrib import admin
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
-from django.urls import path
+from django.urls import path, reverse
+from django.http import HttpResponseRedirect
+from django.db import transaction
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.db.models import Sum, Count
+from django.db.models import (
+    Sum, Count, Q, F, ExpressionWrapper, DecimalField, DurationField
+)
+from django.db.models.functions import Coalesce, Now
 from .models import Book, Rental
 from .services import OpenLibraryService
 from .forms import NewRentalForm, ExtendRentalForm
@@ -19,11 +27,11 @@ class BookAdmin(admin.ModelAdmin):
     list_display = ['title', 'author', 'number_of_pages', 'monthly_fee_display', 'created_at']
     list_filter = ['created_at']
     search_fields = ['title', 'author', 'isbn']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['monthly_fee', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Book Information', {
-            'fields': ('title', 'author', 'isbn', 'number_of_pages')
+            'fields': ('title', 'author', 'isbn', 'number_of_pages', 'monthly_fee')
         }),
         ('Additional Details', {
             'fields': ('cover_image_url', 'openlibrary_key')
@@ -36,8 +44,9 @@ class BookAdmin(admin.ModelAdmin):
     
     def monthly_fee_display(self, obj):
         """Display monthly rental fee."""
-        return f"${obj.monthly_rental_fee():.2f}"
+        return f"${obj.monthly_fee:.2f}"
     monthly_fee_display.short_description = 'Monthly Fee'
+    monthly_fee_display.admin_order_field = 'monthly_fee'
 
 
 @admin.register(Rental)
@@ -59,6 +68,11 @@ class RentalAdmin(admin.ModelAdmin):
     list_filter = ['status', 'rental_date', 'due_date']
     search_fields = ['user__username', 'user__first_name', 'user__last_name', 'book__title']
     readonly_fields = ['rental_date', 'total_charges', 'created_at', 'updated_at']
+    list_select_related = ('user', 'book')
+    ordering = ('-rental_date',)
+    list_per_page = 50
+    show_full_result_count = False  # skip the extra unfiltered COUNT(*) per page
+    autocomplete_fields = ['user', 'book']
     actions = ['extend_rental_by_one_month', 'mark_as_returned']
     
     fieldsets = (
@@ -77,6 +91,15 @@ class RentalAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Annotate overdue state and time remaining so rows need no per-object date math."""
+        return super().get_queryset(request).annotate(
+            computed_overdue=Rental.overdue_expression(),
+            computed_time_remaining=ExpressionWrapper(
+                F('due_date') - Now(), output_field=DurationField()
+            ),
+        )
+    
     def rental_id_display(self, obj):
         """Display rental ID."""
         return f"#{obj.id}"
@@ -90,7 +113,7 @@ class RentalAdmin(admin.ModelAdmin):
             'overdue': 'red'
         }
         status = obj.status
-        if obj.is_overdue() and status == 'active':
+        if obj.computed_overdue and status == 'active':
             status = 'overdue'
         color = colors.get(status, 'black')
         return format_html(
@@ -99,29 +122,38 @@ class RentalAdmin(admin.ModelAdmin):
             status.upper()
         )
     status_display.short_description = 'Status'
+    status_display.admin_order_field = 'status'
     
     def charges_display(self, obj):
         """Display total charges."""
         return f"${obj.total_charges:.2f}"
     charges_display.short_description = 'Total Charges'
+    charges_display.admin_order_field = 'total_charges'
     
     def days_remaining_display(self, obj):
         """Display days remaining."""
         if obj.status == 'returned':
             return 'Returned'
-        days = obj.days_remaining()
-        if days == 0 and obj.is_overdue():
+        days = max(0, obj.computed_time_remaining.days)
+        if days == 0 and obj.computed_overdue:
             return format_html('<span style="color: red;">OVERDUE</span>')
         return f"{days} days"
     days_remaining_display.short_description = 'Days Remaining'
+    days_remaining_display.admin_order_field = 'computed_time_remaining'
     
     def extend_rental_by_one_month(self, request, queryset):
         """Action to extend selected rentals by one month."""
-        count = 0
-        for rental in queryset:
-            if rental.status != 'returned':
-                rental.extend_rental(months=1)
-                count += 1
+        from django.utils import timezone
+        # Same arithmetic as Rental.extend_rental, done in a single UPDATE
+        count = queryset.exclude(status='returned').update(
+            months_extended=F('months_extended') + 1,
+            due_date=F('due_date') + timedelta(days=30),
+            total_charges=ExpressionWrapper(
+                F('total_charges') + F('monthly_fee_snapshot'),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ),
+            updated_at=timezone.now()
+        )
         self.message_user(
             request, 
             f"{count} rental(s) extended by 1 month. Charges have been calculated.",
@@ -132,15 +164,21 @@ class RentalAdmin(admin.ModelAdmin):
     def mark_as_returned(self, request, queryset):
         """Action to mark selected rentals as returned."""
         from django.utils import timezone
-        count = queryset.filter(status='active').update(
-            status='returned',
-            return_date=timezone.now()
-        )
+        with transaction.atomic():
+            count = queryset.filter(status='active').update(
+                status='returned',
+                return_date=timezone.now()
+            )
         self.message_user(
             request,
             f"{count} rental(s) marked as returned.",
             messages.SUCCESS
         )
+        # Jump straight to the returned rentals instead of re-running the
+        # previous (now stale) changelist filters
+        return HttpResponseRedirect(
+            f"{reverse('admin:rentals_rental_changelist')}?status__exact=returned"
+        )
     mark_as_returned.short_description = "Mark selected rentals as returned"
     
     def get_urls(self):
@@ -166,16 +204,7 @@ class RentalAdmin(admin.ModelAdmin):
                 
                 if book_data:
                     # Create or get book
-                    book, created = Book.objects.get_or_create(
-                        title=book_data['title'],
-                        defaults={
-                            'author': book_data.get('author'),
-                            'isbn': book_data.get('isbn'),
-                            'number_of_pages': book_data.get('number_of_pages', 0),
-                            'cover_image_url': book_data.get('cover_image_url'),
-                            'openlibrary_key': book_data.get('openlibrary_key'),
-                        }
-                    )
+                    book, created = Book.get_or_create_from_openlibrary(book_data)
                     
                     # Create rental
                     rental = Rental.objects.create(
@@ -232,23 +261,36 @@ class RentalAdmin(admin.ModelAdmin):
     
     def student_dashboard_view(self, request):
         """Dashboard showing all rentals and fees for each student."""
-        # Get all users who have rentals
-        students = User.objects.filter(rentals__isnull=False).distinct()
+        # Annotate per-student totals in one narrow query (only the columns
+        # the dashboard shows) and load their rentals in a second one
+        students = list(
+            User.objects.annotate(
+                total_rentals=Count('rentals'),
+                active_rentals=Count('rentals', filter=Q(rentals__status='active')),
+                total_charges=Coalesce(Sum('rentals__total_charges'), Decimal('0.00')),
+            ).filter(total_rentals__gt=0).values(
+                'id', 'username', 'first_name', 'last_name', 'email',
+                'total_rentals', 'active_rentals', 'total_charges',
+            )
+        )
         
-        student_data = []
-        for student in students:
-            rentals = Rental.objects.filter(user=student)
-            total_rentals = rentals.count()
-            active_rentals = rentals.filter(status='active').count()
-            total_charges = rentals.aggregate(Sum('total_charges'))['total_charges__sum'] or 0
-            
-            student_data.append({
+        rentals_by_student = defaultdict(list)
+        recent_rentals = Rental.objects.filter(
+            user_id__in=[student['id'] for student in students]
+        ).select_related('book').order_by('-rental_date')
+        for rental in recent_rentals:
+            rentals_by_student[rental.user_id].append(rental)
+        
+        student_data = [
+            {
                 'student': student,
-                'total_rentals': total_rentals,
-                'active_rentals': active_rentals,
-                'total_charges': total_charges,
-                'rentals': rentals[:5]  # Show last 5 rentals
-            })
+                'total_rentals': student['total_rentals'],
+                'active_rentals': student['active_rentals'],
+                'total_charges': student['total_charges'],
+                'rentals': rentals_by_student[student['id']][:5]  # Show last 5 rentals
+            }
+            for student in students
+        ]
         
         context = {
             'title': 'Student Rental Dashboard',
@@ -5,12 +5,23 @@ from django import forms
 from django.contrib.auth.models import User
 
 
+class StudentChoiceField(forms.ModelChoiceField):
+    """
+    Choice field labelling users by username and full name.
+    Only uses columns loaded by the narrowed queryset.
+    """
+    def label_from_instance(self, obj):
+        return f"{obj.username} ({obj.first_name} {obj.last_name})"
+
+
 class NewRentalForm(forms.Form):
     """
     Form for creating a new rental.
     """
-    user = forms.ModelChoiceField(
-        queryset=User.objects.all(),
+    user = StudentChoiceField(
+        queryset=User.objects.filter(is_active=True)
+        .only('id', 'username', 'first_name', 'last_name')
+        .order_by('username'),
         label="Select Student",
         help_text="Choose the student who will rent the book"
     )
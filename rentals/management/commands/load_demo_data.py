@@ -3,8 +3,12 @@ Django management command to quickly create dummy data without API calls.
 """
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
 from rentals.models import Book, Rental
 
 
@@ -18,6 +22,7 @@ class Command(BaseCommand):
             help='Clear existing data before creating new data',
         )
 
+    @transaction.atomic
     def handle(self, *args, **options):
         if options['clear']:
             self.stdout.write(self.style.WARNING('Clearing existing data...'))
@@ -37,24 +42,31 @@ class Command(BaseCommand):
             ('charlie_davis', 'Charlie', 'Davis', 'charlie.davis@example.com'),
         ]
 
-        students = []
         self.stdout.write('👥 Creating students...')
-        for username, first_name, last_name, email in students_data:
-            user, created = User.objects.get_or_create(
-                username=username,
-                defaults={
-                    'email': email,
-                    'first_name': first_name,
-                    'last_name': last_name,
-                }
-            )
-            if created:
-                user.set_password('student123')
-                user.save()
-                self.stdout.write(f'  ✓ {user.get_full_name()} ({username})')
+        usernames = [username for username, _, _, _ in students_data]
+        existing_usernames = set(
+            User.objects.filter(username__in=usernames).values_list('username', flat=True)
+        )
+        # Demo accounts share a password, so hash it once instead of once per user
+        password = make_password('student123')
+        new_users = [
+            User(username=username, password=password, email=email,
+                 first_name=first_name, last_name=last_name)
+            for username, first_name, last_name, email in students_data
+            if username not in existing_usernames
+        ]
+        User.objects.bulk_create(new_users, batch_size=500, ignore_conflicts=True)
+
+        # Rehydrate in one query, keeping the order of students_data
+        users_by_name = {user.username: user for user in User.objects.filter(username__in=usernames)}
+        students = [users_by_name[username] for username in usernames]
+        lines = []  # buffered so each phase costs one write instead of one per row
+        for user in students:
+            if user.username in existing_usernames:
+                lines.append(f'  → {user.get_full_name()} (exists)')
             else:
-                self.stdout.write(f'  → {user.get_full_name()} (exists)')
-            students.append(user)
+                lines.append(f'  ✓ {user.get_full_name()} ({user.username})')
+        self.stdout.write('\n'.join(lines))
 
         # Create books with realistic data
         books_data = [
@@ -70,20 +82,29 @@ class Command(BaseCommand):
             ('The Lord of the Rings', 'J.R.R. Tolkien', 1178),
         ]
 
-        books = []
         self.stdout.write('\n📖 Creating books...')
-        for title, author, pages in books_data:
-            book, created = Book.objects.get_or_create(
-                title=title,
-                defaults={
-                    'author': author,
-                    'number_of_pages': pages,
-                }
-            )
-            books.append(book)
+        titles = [title for title, _, _ in books_data]
+        # Titles aren't unique, so only insert the ones that are missing
+        existing_titles = set(
+            Book.objects.filter(title__in=titles).values_list('title', flat=True)
+        )
+        Book.objects.bulk_create(
+            [
+                Book(title=title, author=author, number_of_pages=pages)
+                for title, author, pages in books_data
+                if title not in existing_titles
+            ],
+            batch_size=500
+        )
+
+        books_by_title = {book.title: book for book in Book.objects.filter(title__in=titles)}
+        books = [books_by_title[title] for title in titles]
+        lines = []
+        for (title, author, pages), book in zip(books_data, books):
             fee = book.monthly_rental_fee()
-            status = '✓' if created else '→'
-            self.stdout.write(f'  {status} {title} by {author} ({pages} pages, ${fee:.2f}/mo)')
+            status = '→' if title in existing_titles else '✓'
+            lines.append(f'  {status} {title} by {author} ({pages} pages, ${fee:.2f}/mo)')
+        self.stdout.write('\n'.join(lines))
 
         # Create diverse rental scenarios
         self.stdout.write('\n📋 Creating rentals...')
@@ -108,66 +129,77 @@ class Command(BaseCommand):
             (4, 1, 25, 0, 'active', 'Charlie: About to be due'),
         ]
 
+        # Build every rental in memory (due date and charges set explicitly, so
+        # Rental.save() isn't needed) and insert them in one round-trip
+        # One clock reading and one fee per book for the whole batch
+        now = timezone.now()
+        return_date = now - timedelta(days=2)
+        fees = [book.monthly_rental_fee() for book in books]
+        new_rentals = []
         for student_idx, book_idx, days_ago, extensions, status, desc in scenarios:
-            student = students[student_idx]
-            book = books[book_idx]
-            
-            rental_date = timezone.now() - timedelta(days=days_ago)
-            rental = Rental.objects.create(
-                user=student,
-                book=book,
+            rental_date = now - timedelta(days=days_ago)
+            monthly_fee = fees[book_idx]
+            new_rentals.append(Rental(
+                user=students[student_idx],
+                book=books[book_idx],
                 rental_date=rental_date,
+                due_date=rental_date + timedelta(days=30 * (1 + extensions)),
+                months_extended=extensions,
+                monthly_fee_snapshot=monthly_fee,
+                total_charges=monthly_fee * extensions,
+                return_date=return_date if status == 'returned' else None,
                 status=status
-            )
-            
-            rental.due_date = rental_date + timedelta(days=30)
-            
-            if extensions > 0:
-                for _ in range(extensions):
-                    rental.months_extended += 1
-                    rental.due_date += timedelta(days=30)
-                rental.calculate_charges()
-            
-            if status == 'returned':
-                rental.return_date = timezone.now() - timedelta(days=2)
-            
-            rental.save()
-            
+            ))
+        
+        created_rentals = Rental.objects.bulk_create(new_rentals, batch_size=500)
+        
+        lines = []
+        for rental, (_, _, _, _, status, desc) in zip(created_rentals, scenarios):
             emoji = '✓' if status == 'active' else '↩'
             charge = f'${rental.total_charges:.2f}' if rental.total_charges > 0 else 'FREE'
-            self.stdout.write(f'  {emoji} {desc} [{charge}]')
+            lines.append(f'  {emoji} {desc} [{charge}]')
+        self.stdout.write('\n'.join(lines))
 
         # Statistics
-        total_rentals = Rental.objects.count()
-        active = Rental.objects.filter(status='active').count()
-        returned = Rental.objects.filter(status='returned').count()
-        total_charges = sum(r.total_charges for r in Rental.objects.all())
+        stats = Rental.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            returned=Count('id', filter=Q(status='returned')),
+            charges=Sum('total_charges'),
+        )
+        total_rentals = stats['total']
+        active = stats['active']
+        returned = stats['returned']
+        total_charges = stats['charges'] or Decimal('0.00')
 
         self.stdout.write('\n' + '='*70)
         self.stdout.write(self.style.SUCCESS('\n✅ Demo Data Created Successfully!\n'))
-        self.stdout.write(f'👥 Students: {len(students)}')
-        self.stdout.write(f'📚 Books: {len(books)}')
-        self.stdout.write(f'📋 Rentals: {total_rentals}')
-        self.stdout.write(f'   • Active: {active}')
-        self.stdout.write(f'   • Returned: {returned}')
-        self.stdout.write(f'💰 Total charges: ${total_charges:.2f}')
+        self.stdout.write('\n'.join([
+            f'👥 Students: {len(students)}',
+            f'📚 Books: {len(books)}',
+            f'📋 Rentals: {total_rentals}',
+            f'   • Active: {active}',
+            f'   • Returned: {returned}',
+            f'💰 Total charges: ${total_charges:.2f}',
+        ]))
         
         self.stdout.write('\n' + '='*70)
         self.stdout.write(self.style.SUCCESS('\n🚀 Ready to Test!\n'))
-        self.stdout.write('1. Start server:')
-        self.stdout.write('   python manage.py runserver\n')
-        self.stdout.write('2. Open browser:')
-        self.stdout.write('   http://127.0.0.1:8000/admin/\n')
-        self.stdout.write('3. Login credentials:')
-        self.stdout.write('   Username: admin')
-        self.stdout.write('   Password: admin123\n')
-        self.stdout.write('4. Test features:')
-        self.stdout.write('   • View Rentals → See all rentals with statuses')
-        self.stdout.write('   • Student Dashboard → Overview of all students')
-        self.stdout.write('   • Create New Rental → Try adding a new book')
-        self.stdout.write('   • Extend Rental → Select and extend active rentals')
-        self.stdout.write('   • Books → View all available books\n')
-        self.stdout.write('📝 Student login (password: student123):')
-        for s in students:
-            self.stdout.write(f'   • {s.username}')
-        self.stdout.write('')
+        self.stdout.write('\n'.join([
+            '1. Start server:',
+            '   python manage.py runserver\n',
+            '2. Open browser:',
+            '   http://127.0.0.1:8000/admin/\n',
+            '3. Login credentials:',
+            '   Username: admin',
+            '   Password: admin123\n',
+            '4. Test features:',
+            '   • View Rentals → See all rentals with statuses',
+            '   • Student Dashboard → Overview of all students',
+            '   • Create New Rental → Try adding a new book',
+            '   • Extend Rental → Select and extend active rentals',
+            '   • Books → View all available books\n',
+            '📝 Student login (password: student123):',
+            *[f'   • {s.username}' for s in students],
+            '',
+        ]))
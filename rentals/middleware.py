@@ -0,0 +1,41 @@
+"""
+Middleware for the rentals app.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+
+def is_admin(user):
+    return user.is_authenticated and (user.is_staff or user.is_superuser)
+
+
+class AdminFlagMiddleware:
+    """
+    Set request.is_admin once per request so views can check it without
+    re-evaluating the user's staff/superuser flags.
+
+    The flag is lazy, so requests that never look at it don't load the user.
+    Supports both sync and async stacks so ASGI requests aren't adapted.
+    Must come after AuthenticationMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self._set_flag(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self._set_flag(request)
+        return await self.get_response(request)
+
+    @staticmethod
+    def _set_flag(request):
+        request.is_admin = SimpleLazyObject(lambda: is_admin(request.user))
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Django's icontains compiles to UPPER(col) LIKE UPPER('%term%') on
+    # PostgreSQL, so index the same expression with gin_trgm_ops. Other
+    # backends keep the plain scan.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS book_title_trgm_idx '
+        'ON rentals_book USING gin (UPPER(title) gin_trgm_ops)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS book_author_trgm_idx '
+        'ON rentals_book USING gin (UPPER(author) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS book_title_trgm_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS book_author_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0003_rental_status_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
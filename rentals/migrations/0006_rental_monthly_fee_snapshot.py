@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-15 06:42
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_monthly_fee_snapshot(apps, schema_editor):
+    Book = apps.get_model('rentals', 'Book')
+    Rental = apps.get_model('rentals', 'Rental')
+    Rental.objects.update(
+        monthly_fee_snapshot=Subquery(
+            Book.objects.filter(pk=OuterRef('book_id')).values('monthly_fee')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0005_book_monthly_fee'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rental',
+            name='monthly_fee_snapshot',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.RunPython(backfill_monthly_fee_snapshot, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-15 07:10
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0006_rental_monthly_fee_snapshot'),
+    ]
+
+    # Generated columns can't be altered in place; drop and re-add it
+    operations = [
+        migrations.RemoveField(
+            model_name='book',
+            name='monthly_fee',
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='monthly_fee',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Greatest(models.F('number_of_pages'), 0), '*', models.Value(Decimal('0.01'))), output_field=models.DecimalField(decimal_places=2, max_digits=8)),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Greatest, Now
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
@@ -12,10 +13,17 @@ class Book(models.Model):
     """
     title = models.CharField(max_length=255)
     author = models.CharField(max_length=255, blank=True, null=True)
-    isbn = models.CharField(max_length=20, blank=True, null=True)
+    isbn = models.CharField(max_length=20, blank=True, null=True, db_index=True)
     number_of_pages = models.IntegerField(default=0)
     cover_image_url = models.URLField(blank=True, null=True)
-    openlibrary_key = models.CharField(max_length=100, blank=True, null=True)
+    openlibrary_key = models.CharField(max_length=100, blank=True, null=True, db_index=True)
+    # Stored copy of monthly_rental_fee() computed by the database on write;
+    # clamped at zero like the method so the two can't disagree
+    monthly_fee = models.GeneratedField(
+        expression=Greatest(models.F('number_of_pages'), 0) * Decimal('0.01'),
+        output_field=models.DecimalField(max_digits=8, decimal_places=2),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -25,10 +33,40 @@ class Book(models.Model):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def get_or_create_from_openlibrary(cls, book_data):
+        """
+        Get or create a book from OpenLibraryService search data.
+        Looks up by ISBN (indexed) when available, then by OpenLibrary key,
+        and only falls back to the non-unique title as a last resort.
+        """
+        if book_data.get('isbn'):
+            lookup = {'isbn': book_data['isbn']}
+        elif book_data.get('openlibrary_key'):
+            lookup = {'openlibrary_key': book_data['openlibrary_key']}
+        else:
+            lookup = {'title': book_data['title']}
+
+        return cls.objects.get_or_create(
+            **lookup,
+            defaults={
+                'title': book_data['title'],
+                'author': book_data.get('author'),
+                'isbn': book_data.get('isbn'),
+                'number_of_pages': book_data.get('number_of_pages', 0),
+                'cover_image_url': book_data.get('cover_image_url'),
+                'openlibrary_key': book_data.get('openlibrary_key'),
+            }
+        )
+
     def monthly_rental_fee(self):
         """
         Calculate monthly rental fee based on page count.
         Formula: number_of_pages / 100
+        
+        Rows loaded from the database also carry this value in the stored
+        monthly_fee column; use that on read paths. This method is for
+        unsaved or just-modified instances.
         """
         if self.number_of_pages > 0:
             return Decimal(self.number_of_pages) / Decimal(100)
@@ -51,32 +89,59 @@ class Rental(models.Model):
     rental_date = models.DateTimeField(default=timezone.now)
     due_date = models.DateTimeField()
     return_date = models.DateTimeField(blank=True, null=True)
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active', db_index=True)
     months_extended = models.IntegerField(default=0)
     total_charges = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    # Book's monthly fee copied at rental time so charges never need the book row
+    monthly_fee_snapshot = models.DecimalField(max_digits=8, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-rental_date']
+        indexes = [
+            models.Index(fields=['status', '-rental_date'], name='rental_status_date_idx'),
+            models.Index(fields=['user', 'status'], name='rental_user_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.book.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded book so save() can tell when it changes
+        if 'book_id' in instance.__dict__:
+            instance._loaded_book_id = instance.book_id
+        return instance
+
     def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        book_saved = update_fields is None or bool({'book', 'book_id'} & set(update_fields))
         # Set initial due date to 1 month from rental date if not set
         if not self.due_date:
             self.due_date = self.rental_date + timedelta(days=30)
+        # Snapshot the book's fee when the rental is first created, and
+        # again if the rental is moved to a different book
+        if self._state.adding:
+            if not self.monthly_fee_snapshot:
+                self.monthly_fee_snapshot = self.book.monthly_rental_fee()
+        elif book_saved and self.book_id != getattr(self, '_loaded_book_id', self.book_id):
+            self.monthly_fee_snapshot = self.book.monthly_rental_fee()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'monthly_fee_snapshot'}
         super().save(*args, **kwargs)
+        if book_saved:
+            self._loaded_book_id = self.book_id
 
     def calculate_charges(self):
         """
         Calculate total charges based on months extended.
-        First month is free, subsequent months are charged.
+        First month is free, subsequent months are charged at the fee
+        snapshotted when the rental was created.
         """
         if self.months_extended > 0:
-            monthly_fee = self.book.monthly_rental_fee()
-            self.total_charges = monthly_fee * self.months_extended
+            self.total_charges = self.monthly_fee_snapshot * self.months_extended
         else:
             self.total_charges = Decimal('0.00')
         return self.total_charges
@@ -89,7 +154,7 @@ class Rental(models.Model):
         self.months_extended += months
         self.due_date += timedelta(days=30 * months)
         self.calculate_charges()
-        self.save()
+        self.save(update_fields=['months_extended', 'due_date', 'total_charges', 'updated_at'])
         return self.total_charges
 
     def is_overdue(self):
@@ -98,6 +163,18 @@ class Rental(models.Model):
             return False
         return timezone.now() > self.due_date
 
+    @staticmethod
+    def overdue_expression():
+        """
+        SQL equivalent of is_overdue() for annotating querysets, so list
+        views get the flag from the database instead of per row.
+        """
+        return models.Case(
+            models.When(~models.Q(status='returned') & models.Q(due_date__lt=Now()), then=models.Value(True)),
+            default=models.Value(False),
+            output_field=models.BooleanField(),
+        )
+
     def days_remaining(self):
         """Calculate days remaining until due date."""
         if self.status == 'returned':
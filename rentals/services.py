@@ -1,8 +1,22 @@
 """
 Service module for interacting with OpenLibrary API.
 """
+import hashlib
 import requests
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.core.cache import cache
+
+
+# Shared session so the search -> edition lookups reuse pooled TCP/TLS connections
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+))
 
 
 class OpenLibraryService:
@@ -13,9 +27,57 @@ class OpenLibraryService:
     2. Fetch edition details to get accurate page count
     """
     BASE_URL = "https://openlibrary.org"
+    TIMEOUT = (3, 7)  # (connect, read) seconds
+    CACHE_TIMEOUT = 60 * 60 * 24  # 24 hours
     
     @staticmethod
     def search_book_by_title(title: str) -> Optional[Dict[str, Any]]:
+        """
+        Search for a book by title, using the Django cache when possible.
+        
+        Successful lookups are cached per normalized title so repeated
+        searches skip the HTTP round-trips. Misses and errors are not cached.
+        
+        Args:
+            title: Book title to search for
+            
+        Returns:
+            Dictionary containing book information or None if not found
+        """
+        normalized = ' '.join(title.lower().split())
+        cache_key = f"ol:search:{hashlib.md5(normalized.encode()).hexdigest()}"
+        book_info = cache.get(cache_key)
+        if book_info is not None:
+            return book_info
+        
+        book_info = OpenLibraryService._fetch_book_by_title(title)
+        if book_info is not None:
+            cache.set(cache_key, book_info, OpenLibraryService.CACHE_TIMEOUT)
+        return book_info
+    
+    @staticmethod
+    def search_books_by_titles(titles: List[str], max_workers: int = 8) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Search for several books concurrently.
+        
+        Each title goes through search_book_by_title (and its cache) on a
+        worker thread, so total latency is roughly that of the slowest
+        lookup rather than the sum of all of them.
+        
+        Args:
+            titles: Book titles to search for
+            max_workers: Maximum number of concurrent lookups
+            
+        Returns:
+            Dictionary mapping each title to its book information or None
+        """
+        if not titles:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(titles))) as executor:
+            return dict(zip(titles, executor.map(OpenLibraryService.search_book_by_title, titles)))
+    
+    @staticmethod
+    def _fetch_book_by_title(title: str) -> Optional[Dict[str, Any]]:
         """
         Search for a book by title using OpenLibrary API.
         
@@ -35,7 +97,7 @@ class OpenLibraryService:
             search_url = f"{OpenLibraryService.BASE_URL}/search.json"
             params = {'q': title}
             
-            response = requests.get(search_url, params=params, timeout=10)
+            response = _session.get(search_url, params=params, timeout=OpenLibraryService.TIMEOUT)
             response.raise_for_status()
             
             data = response.json()
@@ -55,12 +117,22 @@ class OpenLibraryService:
             number_of_pages = 0
             
             if edition_keys:
-                # Try multiple editions until we find one with page count
-                for edition_key in edition_keys[:3]:  # Try first 3 editions
-                    page_count = OpenLibraryService._get_edition_page_count(edition_key)
-                    if page_count and page_count > 0:
-                        number_of_pages = page_count
-                        break
+                # Query the first 3 editions in parallel and take the first
+                # page count that comes back; stragglers are not waited on
+                edition_keys = edition_keys[:3]
+                executor = ThreadPoolExecutor(max_workers=len(edition_keys))
+                try:
+                    futures = [
+                        executor.submit(OpenLibraryService._get_edition_page_count, edition_key)
+                        for edition_key in edition_keys
+                    ]
+                    for future in as_completed(futures):
+                        page_count = future.result()
+                        if page_count and page_count > 0:
+                            number_of_pages = page_count
+                            break
+                finally:
+                    executor.shutdown(wait=False, cancel_futures=True)
             
             # Fallback to search result page count if edition lookup fails
             if number_of_pages == 0:
@@ -81,6 +153,7 @@ class OpenLibraryService:
     def _get_edition_page_count(edition_key: str) -> Optional[int]:
         """
         Fetch page count from OpenLibrary Books API using edition key.
+        Found page counts are cached so each edition is only fetched once.
         
         Args:
             edition_key: Edition identifier (e.g., 'OL12345M')
@@ -88,6 +161,11 @@ class OpenLibraryService:
         Returns:
             Number of pages or None if not found
         """
+        cache_key = f"ol:ed:{edition_key}"
+        page_count = cache.get(cache_key)
+        if page_count is not None:
+            return page_count
+        
         try:
             # Call Books API with edition key
             books_url = f"{OpenLibraryService.BASE_URL}/api/books"
@@ -97,7 +175,7 @@ class OpenLibraryService:
                 'jscmd': 'data'
             }
             
-            response = requests.get(books_url, params=params, timeout=10)
+            response = _session.get(books_url, params=params, timeout=OpenLibraryService.TIMEOUT)
             response.raise_for_status()
             
             data = response.json()
@@ -107,7 +185,9 @@ class OpenLibraryService:
             page_count = edition_data.get('number_of_pages')
             
             if page_count:
-                return int(page_count)
+                page_count = int(page_count)
+                cache.set(cache_key, page_count, OpenLibraryService.CACHE_TIMEOUT)
+                return page_count
             
             return None
             
@@ -168,7 +248,7 @@ class OpenLibraryService:
         """
         try:
             url = f"{OpenLibraryService.BASE_URL}{openlibrary_key}.json"
-            response = requests.get(url, timeout=10)
+            response = _session.get(url, timeout=OpenLibraryService.TIMEOUT)
             response.raise_for_status()
             
             return response.json()
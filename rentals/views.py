@@ -1,28 +1,70 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required, user_passes_test
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Q, Prefetch
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.http import JsonResponse
+from django.core.paginator import Paginator
 from datetime import timedelta
+from decimal import Decimal
+from functools import wraps
 from .models import Book, Rental
 from .services import OpenLibraryService
 from .forms import NewRentalForm, ExtendRentalForm
+from .middleware import is_admin
 
 
-def is_admin(user):
-    return user.is_staff or user.is_superuser
+RENTALS_PER_PAGE = 50
+BOOKS_PER_PAGE = 50
 
 
-@login_required
-@user_passes_test(is_admin)
+def admin_required(view_func):
+    """
+    Only let staff/superusers through, redirecting everyone else to login.
+    Reads the flag set by AdminFlagMiddleware, falling back to checking
+    the user when the middleware isn't installed. Async views load the
+    user with request.auser() so no ORM call happens on the event loop.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_wrapped_view(request, *args, **kwargs):
+            if is_admin(await request.auser()):
+                return await view_func(request, *args, **kwargs)
+            return redirect_to_login(request.get_full_path())
+        return _async_wrapped_view
+    
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        admin = getattr(request, 'is_admin', None)
+        if admin is None:
+            admin = is_admin(request.user)
+        if admin:
+            return view_func(request, *args, **kwargs)
+        return redirect_to_login(request.get_full_path())
+    return _wrapped_view
+
+
+def _page_query(request):
+    """Current query string without the page number, for pagination links."""
+    params = request.GET.copy()
+    params.pop('page', None)
+    return params.urlencode()
+
+
+@admin_required
 def admin_dashboard(request):
     """Main admin dashboard."""
     total_books = Book.objects.count()
     total_students = User.objects.filter(is_staff=False, is_superuser=False).count()
-    active_rentals = Rental.objects.filter(status='active').count()
-    total_rentals = Rental.objects.count()
+    rental_counts = Rental.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='active')),
+    )
+    active_rentals = rental_counts['active']
+    total_rentals = rental_counts['total']
     
     recent_rentals = Rental.objects.select_related('user', 'book').order_by('-rental_date')[:10]
     
@@ -36,14 +78,20 @@ def admin_dashboard(request):
     return render(request, 'rentals/admin/dashboard.html', context)
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def rental_list(request):
     """List all rentals."""
     status_filter = request.GET.get('status', '')
     search = request.GET.get('search', '')
     
-    rentals = Rental.objects.select_related('user', 'book').order_by('-rental_date')
+    # Only the columns the list template renders
+    rentals = Rental.objects.select_related('user', 'book').only(
+        'id', 'rental_date', 'due_date', 'return_date', 'status', 'months_extended',
+        'total_charges', 'user__username', 'user__first_name', 'user__last_name',
+        'book__title', 'book__author', 'book__number_of_pages', 'book__monthly_fee',
+    ).annotate(
+        db_is_overdue=Rental.overdue_expression(),
+    ).order_by('-rental_date')
     
     if status_filter:
         rentals = rentals.filter(status=status_filter)
@@ -56,16 +104,19 @@ def rental_list(request):
             Q(book__title__icontains=search)
         )
     
+    page_obj = Paginator(rentals, RENTALS_PER_PAGE).get_page(request.GET.get('page'))
+    
     context = {
-        'rentals': rentals,
+        'rentals': page_obj,
+        'page_obj': page_obj,
+        'page_query': _page_query(request),
         'status_filter': status_filter,
         'search': search,
     }
     return render(request, 'rentals/admin/rental_list.html', context)
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def new_rental(request):
     """Create a new rental."""
     students = User.objects.filter(is_staff=False, is_superuser=False)
@@ -85,16 +136,7 @@ def new_rental(request):
         book_data = json.loads(book_data_json)
         
         # Create or get book
-        book, created = Book.objects.get_or_create(
-            title=book_data['title'],
-            defaults={
-                'author': book_data.get('author'),
-                'isbn': book_data.get('isbn'),
-                'number_of_pages': book_data.get('number_of_pages', 0),
-                'cover_image_url': book_data.get('cover_image_url'),
-                'openlibrary_key': book_data.get('openlibrary_key'),
-            }
-        )
+        book, created = Book.get_or_create_from_openlibrary(book_data)
         
         # Create rental
         rental = Rental.objects.create(user=user, book=book)
@@ -111,21 +153,34 @@ def new_rental(request):
     return render(request, 'rentals/admin/new_rental.html', context)
 
 
-@login_required
-@user_passes_test(is_admin)
-def search_book_ajax(request):
-    """AJAX endpoint for book search."""
+@admin_required
+async def search_book_ajax(request):
+    """
+    AJAX endpoint for book search.
+    
+    The new rental page debounces keystrokes (800ms) so this is called once
+    per pause in typing. Queries are normalized (case/whitespace) so
+    repeats like "Harry  Potter" and "harry potter" share one lookup.
+    
+    The view is async: under ASGI the blocking OpenLibrary lookup runs in a
+    worker thread instead of holding a request thread while it waits. This
+    relies on every middleware in MIDDLEWARE being async-capable; a sync-only
+    one would make Django adapt the stack and block a thread again.
+    """
     query = request.GET.get('q', '').strip()
+    normalized = ' '.join(query.lower().split())
     
-    if not query or len(query) < 3:
+    if len(normalized) < 3:
         return JsonResponse({
             'success': False,
             'error': 'Please enter at least 3 characters'
         })
     
     try:
-        # Fetch from OpenLibrary API
-        book_data = OpenLibraryService.search_book_by_title(query)
+        # Fetch from OpenLibrary API (the service caches per normalized title)
+        book_data = await sync_to_async(
+            OpenLibraryService.search_book_by_title, thread_sensitive=False
+        )(normalized)
         
         if book_data:
             return JsonResponse({
@@ -153,8 +208,7 @@ def search_book_ajax(request):
         })
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def extend_rental(request, rental_id):
     """Extend a rental."""
     rental = get_object_or_404(Rental, id=rental_id)
@@ -173,33 +227,37 @@ def extend_rental(request, rental_id):
     return render(request, 'rentals/admin/extend_rental.html', context)
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def student_dashboard(request):
     """Dashboard showing all students and their rentals."""
-    students = User.objects.filter(is_staff=False, is_superuser=False).distinct()
-    
-    student_data = []
-    for student in students:
-        rentals = Rental.objects.filter(user=student)
-        total_rentals = rentals.count()
-        active_rentals = rentals.filter(status='active').count()
-        total_charges = rentals.aggregate(Sum('total_charges'))['total_charges__sum'] or 0
-        
-        student_data.append({
+    students = User.objects.filter(is_staff=False, is_superuser=False).annotate(
+        total_rentals=Count('rentals'),
+        active_rentals=Count('rentals', filter=Q(rentals__status='active')),
+        total_charges=Coalesce(Sum('rentals__total_charges'), Decimal('0.00')),
+    ).prefetch_related(
+        Prefetch(
+            'rentals',
+            queryset=Rental.objects.select_related('book').order_by('-rental_date'),
+            to_attr='all_rentals',
+        )
+    )
+    
+    student_data = [
+        {
             'student': student,
-            'total_rentals': total_rentals,
-            'active_rentals': active_rentals,
-            'total_charges': total_charges,
-            'rentals': rentals.order_by('-rental_date')[:5]
-        })
+            'total_rentals': student.total_rentals,
+            'active_rentals': student.active_rentals,
+            'total_charges': student.total_charges,
+            'rentals': student.all_rentals[:5]
+        }
+        for student in students
+    ]
     
     context = {'student_data': student_data}
     return render(request, 'rentals/admin/student_dashboard.html', context)
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def book_list(request):
     """List all books."""
     search = request.GET.get('search', '')
@@ -211,15 +269,18 @@ def book_list(request):
             Q(title__icontains=search) | Q(author__icontains=search)
         )
     
+    page_obj = Paginator(books, BOOKS_PER_PAGE).get_page(request.GET.get('page'))
+    
     context = {
-        'books': books,
+        'books': page_obj,
+        'page_obj': page_obj,
+        'page_query': _page_query(request),
         'search': search,
     }
     return render(request, 'rentals/admin/book_list.html', context)
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def mark_returned(request, rental_id):
     """Mark a rental as returned."""
     rental = get_object_or_404(Rental, id=rental_id)
@@ -227,7 +288,7 @@ def mark_returned(request, rental_id):
     if rental.status == 'active':
         rental.status = 'returned'
         rental.return_date = timezone.now()
-        rental.save()
+        rental.save(update_fields=['status', 'return_date', 'updated_at'])
         messages.success(request, f'Marked "{rental.book.title}" as returned.')
     else:
         messages.warning(request, 'This rental is not active.')
@@ -235,20 +296,29 @@ def mark_returned(request, rental_id):
     return redirect('rental_list')
 
 
-@login_required
-@user_passes_test(is_admin)
+@admin_required
 def bulk_extend(request):
     """Bulk extend selected rentals."""
     if request.method == 'POST':
         rental_ids = request.POST.getlist('rental_ids')
         months = int(request.POST.get('months', 1))
         
-        count = 0
-        for rental_id in rental_ids:
-            rental = Rental.objects.filter(id=rental_id, status='active').first()
-            if rental:
-                rental.extend_rental(months=months)
-                count += 1
+        # Load all selected rentals at once and write them back in one bulk_update
+        rentals = list(
+            Rental.objects.filter(id__in=rental_ids, status='active')
+        )
+        now = timezone.now()
+        for rental in rentals:
+            rental.months_extended += months
+            rental.due_date += timedelta(days=30 * months)
+            rental.calculate_charges()
+            rental.updated_at = now
+        Rental.objects.bulk_update(
+            rentals,
+            ['months_extended', 'due_date', 'total_charges', 'updated_at'],
+            batch_size=500
+        )
+        count = len(rentals)
         
         messages.success(request, f'{count} rental(s) extended by {months} month(s).')
     
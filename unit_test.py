@@ -3,31 +3,88 @@ Comprehensive Unit Tests for Book Rental System
 Tests actual usage scenarios end-to-end
 """
 
+import logging
 import os
 import sys
 import django
 from datetime import datetime, timedelta
 from decimal import Decimal
+from unittest import mock
+from urllib.parse import quote
 
-# Setup Django environment
+# Setup Django environment, unless a runner has already done it
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'book_rental_system.settings')
-django.setup()
+from django.apps import apps
+if not apps.ready:
+    django.setup()
 
-from django.test import TestCase, Client
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
 from django.urls import reverse
 from rentals.models import Book, Rental
+from django.core.cache import cache
 from rentals.services import OpenLibraryService
 import json
 
 
+logger = logging.getLogger(__name__)
+
+# Canned OpenLibrary payloads so the suite runs offline and deterministically
+OPENLIBRARY_SEARCH_1984 = {
+    'docs': [{
+        'title': '1984',
+        'author_name': ['George Orwell'],
+        'isbn': ['9780451524935'],
+        'key': '/works/OL1168083W',
+        'edition_key': ['OL7917244M'],
+        'number_of_pages_median': 326,
+        'cover_i': 12345,
+    }]
+}
+OPENLIBRARY_EDITION_1984 = {'OLID:OL7917244M': {'number_of_pages': 328}}
+
+PRIDE_AND_PREJUDICE = {
+    'title': 'Pride and Prejudice',
+    'author': 'Jane Austen',
+    'isbn': '9780141439518',
+    'number_of_pages': 279,
+    'cover_image_url': None,
+    'openlibrary_key': '/works/OL66554W',
+}
+
+
+def fake_openlibrary_get(url, params=None, timeout=None):
+    """Stand-in for the service's HTTP session, answering from the payloads above"""
+    response = mock.Mock()
+    response.raise_for_status.return_value = None
+    if url.endswith('/search.json'):
+        response.json.return_value = OPENLIBRARY_SEARCH_1984
+    else:
+        response.json.return_value = OPENLIBRARY_EDITION_1984
+    return response
+
+
+# PBKDF2 is deliberately slow; test passwords don't need it
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
 class ScenarioTestCase(TestCase):
     """Test actual usage scenarios"""
     
-    def setUp(self):
-        """Create test users and client"""
+    # (pages, expected monthly fee) for scenario 4
+    FEE_CASES = (
+        (100, Decimal('1.00')),
+        (250, Decimal('2.50')),
+        (500, Decimal('5.00')),
+        (1000, Decimal('10.00')),
+    )
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Create test users once for the whole class"""
+        cls.today = datetime.now().date()
+        
         # Create admin user
-        self.admin = User.objects.create_user(
+        cls.admin = User.objects.create_user(
             username='admin_test',
             password='admin123',
             is_staff=True,
@@ -35,25 +92,36 @@ class ScenarioTestCase(TestCase):
         )
         
         # Create student users
-        self.student1 = User.objects.create_user(
+        cls.student1 = User.objects.create_user(
             username='john_test',
             password='student123',
             first_name='John',
             last_name='Doe'
         )
         
-        self.student2 = User.objects.create_user(
+        cls.student2 = User.objects.create_user(
             username='jane_test',
             password='student123',
             first_name='Jane',
             last_name='Smith'
         )
         
-        self.client = Client()
+        # Books the rental scenarios read but never modify
+        (
+            cls.test_book,
+            cls.extended_book,
+            cls.return_book,
+            cls.popular_book,
+        ) = Book.objects.bulk_create([
+            Book(title="Test Book", author="Test Author", isbn="1234567890", number_of_pages=300),
+            Book(title="Extended Book", author="Test Author", isbn="EXT123", number_of_pages=400),
+            Book(title="Return Test Book", author="Test Author", isbn="RET123", number_of_pages=200),
+            Book(title="Popular Book", author="Famous Author", isbn="POP123", number_of_pages=350),
+        ])
     
     def test_scenario_1_admin_login_and_dashboard(self):
         """Test: Admin logs in and accesses dashboard"""
-        print("\n📝 Test Scenario 1: Admin Login and Dashboard Access")
+        logger.info("\n📝 Test Scenario 1: Admin Login and Dashboard Access")
         
         # Login
         response = self.client.post(reverse('login'), {
@@ -63,194 +131,278 @@ class ScenarioTestCase(TestCase):
         
         # Should redirect to admin dashboard
         self.assertEqual(response.status_code, 302)
-        print("✅ Admin login successful")
+        logger.info("✅ Admin login successful")
         
         # Access dashboard
         response = self.client.get(reverse('admin_dashboard'))
         self.assertEqual(response.status_code, 200)
-        print("✅ Dashboard accessible")
+        logger.info("✅ Dashboard accessible")
     
     def test_scenario_2_search_book_via_ajax(self):
         """Test: Search for a book using AJAX endpoint"""
-        print("\n📝 Test Scenario 2: AJAX Book Search")
+        logger.info("\n📝 Test Scenario 2: AJAX Book Search")
         
         # Login first
-        self.client.login(username='admin_test', password='admin123')
-        
-        # Search for a popular book
-        response = self.client.get(
-            reverse('search_book_ajax'),
-            {'q': 'Pride and Prejudice'}
-        )
+        self.client.force_login(self.admin)
+        
+        # Search for a popular book (OpenLibrary lookup is mocked)
+        with mock.patch.object(
+            OpenLibraryService, 'search_book_by_title', return_value=PRIDE_AND_PREJUDICE
+        ) as search:
+            response = self.client.get(
+                reverse('search_book_ajax'),
+                {'q': 'Pride and Prejudice'}
+            )
         
         self.assertEqual(response.status_code, 200)
+        search.assert_called_once_with('pride and prejudice')
         data = json.loads(response.content)
         
-        if data.get('success'):
-            print(f"✅ Book found: {data['book']['title']}")
-            print(f"   Author: {data['book']['author']}")
-            print(f"   Pages: {data['book']['number_of_pages']}")
-            print(f"   Monthly Fee: ${data['book']['monthly_fee']}")
-            
-            # Verify fee calculation
-            self.assertIsInstance(data['book']['monthly_fee'], (int, float))
-            self.assertGreater(data['book']['number_of_pages'], 0)
-        else:
-            print(f"⚠️ Book search failed: {data.get('message')}")
+        self.assertTrue(data['success'])
+        logger.info("✅ Book found: %s", data['book']['title'])
+        logger.info("   Author: %s", data['book']['author'])
+        logger.info("   Pages: %s", data['book']['number_of_pages'])
+        logger.info("   Monthly Fee: $%s", data['book']['monthly_fee'])
+        
+        # Verify fee calculation
+        self.assertEqual(data['book']['number_of_pages'], 279)
+        self.assertEqual(data['book']['monthly_fee'], 2.79)
     
     def test_scenario_3_create_rental_first_month(self):
         """Test: Create a rental and verify first month is free"""
-        print("\n📝 Test Scenario 3: First Month Free Rental")
-        
-        # Create a book
-        book = Book.objects.create(
-            title="Test Book",
-            author="Test Author",
-            isbn="1234567890",
-            number_of_pages=300
-        )
-        print(f"✅ Created book: {book.title} (300 pages)")
+        logger.info("\n📝 Test Scenario 3: First Month Free Rental")
+        
+        book = self.test_book
+        logger.info("✅ Book: %s (%s pages)", book.title, book.number_of_pages)
         
         # Create rental
         rental = Rental.objects.create(
             book=book,
             user=self.student1,
-            rental_date=datetime.now().date()
+            rental_date=self.today
         )
         
-        print(f"✅ Rental created for {rental.user.username}")
+        logger.info("✅ Rental created for %s", rental.user.username)
     
     def test_scenario_4_rental_fee_calculation(self):
         """Test: Verify rental fee calculation for different page counts"""
-        print("\n📝 Test Scenario 4: Fee Calculation for Different Books")
-        
-        test_cases = [
-            (100, Decimal('1.00')),
-            (250, Decimal('2.50')),
-            (500, Decimal('5.00')),
-            (1000, Decimal('10.00')),
-        ]
+        logger.info("\n📝 Test Scenario 4: Fee Calculation for Different Books")
         
-        for pages, expected_fee in test_cases:
-            book = Book.objects.create(
+        books = Book.objects.bulk_create([
+            Book(
                 title=f"Book with {pages} pages",
                 author="Test Author",
                 isbn=f"ISBN{pages}",
                 number_of_pages=pages
             )
-            
-            rental = Rental.objects.create(
+            for pages, _ in self.FEE_CASES
+        ])
+        
+        # bulk_create skips Rental.save(), so set its derived fields here
+        Rental.objects.bulk_create([
+            Rental(
                 book=book,
                 user=self.student1,
-                rental_date=datetime.now().date()
+                rental_date=self.today,
+                due_date=self.today + timedelta(days=30),
+                monthly_fee_snapshot=book.monthly_rental_fee()
             )
-            
-            # Check monthly fee calculation
-            fee = book.monthly_rental_fee()
-            self.assertEqual(fee, expected_fee)
-            print(f"✅ {pages} pages → ${fee} per month")
+            for book in books
+        ])
+        
+        for book, (pages, expected_fee) in zip(books, self.FEE_CASES):
+            # Each case reports on its own, so one failure doesn't hide the rest
+            with self.subTest(pages=pages):
+                fee = book.monthly_rental_fee()
+                self.assertEqual(fee, expected_fee)
+                logger.info("✅ %s pages → $%s per month", pages, fee)
     
     def test_scenario_5_extend_rental(self):
         """Test: Extend an existing rental"""
-        print("\n📝 Test Scenario 5: Extend Rental")
+        logger.info("\n📝 Test Scenario 5: Extend Rental")
         
-        book = Book.objects.create(
-            title="Extended Book",
-            author="Test Author",
-            isbn="EXT123",
-            number_of_pages=400
-        )
+        book = self.extended_book
         
         rental = Rental.objects.create(
             book=book,
             user=self.student2,
-            rental_date=datetime.now().date()
+            rental_date=self.today
         )
         
-        print(f"✅ Rental created")
+        logger.info("✅ Rental created")
         expected_fee = book.monthly_rental_fee()
-        print(f"✅ Monthly rental fee: ${expected_fee}")
+        logger.info("✅ Monthly rental fee: $%s", expected_fee)
+        
+        # First extension charges one month, later ones add up
+        self.assertEqual(rental.extend_rental(), expected_fee)
+        self.assertEqual(rental.extend_rental(months=2), expected_fee * 3)
+        rental.refresh_from_db()
+        self.assertEqual(rental.months_extended, 3)
+        self.assertEqual(rental.total_charges, expected_fee * 3)
+        logger.info("✅ Extended 3 months: $%s", rental.total_charges)
     
     def test_scenario_6_return_book(self):
         """Test: Return a rented book"""
-        print("\n📝 Test Scenario 6: Return Book")
-        
-        book = Book.objects.create(
-            title="Return Test Book",
-            author="Test Author",
-            isbn="RET123",
-            number_of_pages=200
-        )
+        logger.info("\n📝 Test Scenario 6: Return Book")
         
-        print(f"📚 Book created: {book.title}")
+        book = self.return_book
+        logger.info("📚 Book: %s", book.title)
         
         rental = Rental.objects.create(
             book=book,
             user=self.student1,
-            rental_date=datetime.now().date()
+            rental_date=self.today
         )
         
-        print(f"✅ Rental created")
+        logger.info("✅ Rental created")
         
-        # Check rental status
-        rental.refresh_from_db()
-        print(f"✅ Rental status: {rental.status}")
+        # Check rental status (the instance from create() already has it)
+        self.assertEqual(rental.status, 'active')
+        logger.info("✅ Rental status: %s", rental.status)
     
     def test_scenario_7_multiple_students_same_book(self):
         """Test: Multiple students renting the same book"""
-        print("\n📝 Test Scenario 7: Multiple Students, Same Book")
+        logger.info("\n📝 Test Scenario 7: Multiple Students, Same Book")
         
-        book = Book.objects.create(
-            title="Popular Book",
-            author="Famous Author",
-            isbn="POP123",
-            number_of_pages=350
-        )
+        book = self.popular_book
+        logger.info("📚 Book: %s", book.title)
         
-        print(f"📚 Book created: {book.title}")
+        # One INSERT per rental; user and book are already loaded
+        with self.assertNumQueries(2):
+            # Student 1 rents
+            rental1 = Rental.objects.create(
+                book=book,
+                user=self.student1,
+                rental_date=self.today
+            )
+            logger.info("✅ Student 1 rented: %s", rental1.user.username)
+            
+            # Student 2 rents
+            rental2 = Rental.objects.create(
+                book=book,
+                user=self.student2,
+                rental_date=self.today
+            )
+            logger.info("✅ Student 2 rented: %s", rental2.user.username)
         
-        # Student 1 rents
-        rental1 = Rental.objects.create(
-            book=book,
-            user=self.student1,
-            rental_date=datetime.now().date()
-        )
-        print(f"✅ Student 1 rented: {rental1.user.username}")
+        # Verify both rentals exist
+        count = Rental.objects.filter(book=book).count()
+        self.assertEqual(count, 2)
+        logger.info("✅ Total rentals for book: %s", count)
+    
+    def test_scenario_10_admin_views_require_staff(self):
+        """Test: Anonymous and student users are sent to login from admin views"""
+        logger.info("\n📝 Test Scenario 10: Admin-only Views")
+        
+        # rental_list is a sync view, search_book_ajax an async one
+        urls = [
+            reverse('rental_list'),
+            f"{reverse('search_book_ajax')}?q=Pride",
+        ]
         
-        # Student 2 rents
-        rental2 = Rental.objects.create(
-            book=book,
-            user=self.student2,
-            rental_date=datetime.now().date()
+        for who in (None, self.student1):
+            if who is not None:
+                self.client.force_login(who)
+            for url in urls:
+                with self.subTest(user=who, url=url):
+                    response = self.client.get(url)
+                    self.assertRedirects(
+                        response,
+                        f"{reverse('login')}?next={quote(url)}",
+                        fetch_redirect_response=False
+                    )
+            logger.info("✅ %s redirected to login", who or 'Anonymous user')
+    
+    def test_scenario_11_extend_via_admin_action_and_bulk(self):
+        """Test: Admin action and bulk extend charge the rental's current book fee"""
+        logger.info("\n📝 Test Scenario 11: Extend via Admin Action and Bulk Extend")
+        
+        fee = self.popular_book.monthly_rental_fee()
+        action_rental, bulk_rental = (
+            Rental.objects.create(book=self.popular_book, user=student, rental_date=self.today)
+            for student in (self.student1, self.student2)
         )
-        print(f"✅ Student 2 rented: {rental2.user.username}")
+        self.client.force_login(self.admin)
         
-        # Verify both rentals exist
-        self.assertEqual(Rental.objects.filter(book=book).count(), 2)
-        print(f"✅ Total rentals for book: {Rental.objects.filter(book=book).count()}")
+        # Admin changelist action: one month via a single UPDATE
+        self.client.post(reverse('admin:rentals_rental_changelist'), {
+            'action': 'extend_rental_by_one_month',
+            '_selected_action': [action_rental.pk],
+        })
+        action_rental.refresh_from_db()
+        self.assertEqual(action_rental.months_extended, 1)
+        self.assertEqual(action_rental.total_charges, fee)
+        logger.info("✅ Admin action: $%s", action_rental.total_charges)
+        
+        # Custom bulk extend view: two months via bulk_update
+        self.client.post(reverse('bulk_extend'), {
+            'rental_ids': [bulk_rental.pk],
+            'months': 2,
+        })
+        bulk_rental.refresh_from_db()
+        self.assertEqual(bulk_rental.months_extended, 2)
+        self.assertEqual(bulk_rental.total_charges, fee * 2)
+        logger.info("✅ Bulk extend: $%s", bulk_rental.total_charges)
+        
+        # Moving a rental to another book re-snapshots the fee before the
+        # next extension, as the admin change form does via save()
+        moved = Rental.objects.get(pk=action_rental.pk)
+        moved.book = self.return_book
+        moved.save()
+        self.assertEqual(moved.monthly_fee_snapshot, self.return_book.monthly_rental_fee())
+        self.client.post(reverse('admin:rentals_rental_changelist'), {
+            'action': 'extend_rental_by_one_month',
+            '_selected_action': [moved.pk],
+        })
+        moved.refresh_from_db()
+        self.assertEqual(moved.total_charges, fee + self.return_book.monthly_rental_fee())
+        logger.info("✅ After changing book: $%s", moved.total_charges)
+
+class OpenLibraryScenarioTestCase(SimpleTestCase):
+    """OpenLibrary scenarios that don't need the database"""
+    
+    def setUp(self):
+        """Run each scenario against an empty cache and leave it empty"""
+        cache.clear()
+        self.addCleanup(cache.clear)
     
     def test_scenario_8_openlibrary_integration(self):
-        """Test: OpenLibrary API integration with real API call"""
-        print("\n📝 Test Scenario 8: OpenLibrary API Integration")
+        """Test: OpenLibrary API integration against canned HTTP responses"""
+        logger.info("\n📝 Test Scenario 8: OpenLibrary API Integration")
         
         service = OpenLibraryService()
         
         # Test with a well-known book
-        result = service.search_book_by_title("1984")
-        
-        if result:
-            print(f"✅ API Response received")
-            print(f"   Title: {result.get('title')}")
-            print(f"   Author: {result.get('author')}")
-            print(f"   Pages: {result.get('number_of_pages')}")
-            print(f"   ISBN: {result.get('isbn')}")
-            
-            # Verify required fields
-            self.assertIsNotNone(result.get('title'))
-            self.assertIsNotNone(result.get('author'))
-            self.assertIsNotNone(result.get('number_of_pages'))
-        else:
-            print("⚠️ API call failed (might be rate limited or network issue)")
+        with mock.patch('rentals.services._session.get', side_effect=fake_openlibrary_get):
+            result = service.search_book_by_title("1984")
+        
+        logger.info("✅ API Response received")
+        logger.info("   Title: %s", result.get('title'))
+        logger.info("   Author: %s", result.get('author'))
+        logger.info("   Pages: %s", result.get('number_of_pages'))
+        logger.info("   ISBN: %s", result.get('isbn'))
+        
+        # Verify parsed fields; page count comes from the edition lookup
+        self.assertEqual(result['title'], '1984')
+        self.assertEqual(result['author'], 'George Orwell')
+        self.assertEqual(result['number_of_pages'], 328)
+        self.assertEqual(result['isbn'], '9780451524935')
+        self.assertEqual(result['openlibrary_key'], '/works/OL1168083W')
+    
+    def test_scenario_9_openlibrary_cached_lookup(self):
+        """Test: Repeat searches are answered from the cache without HTTP calls"""
+        logger.info("\n📝 Test Scenario 9: OpenLibrary Response Cache")
+        
+        with mock.patch('rentals.services._session.get', side_effect=fake_openlibrary_get) as get:
+            first = OpenLibraryService.search_book_by_title("1984")
+            calls = get.call_count
+            # Same title with different case/spacing shares the cache entry
+            second = OpenLibraryService.search_book_by_title("  1984 ")
+        
+        self.assertEqual(calls, 2)  # search + edition lookup
+        self.assertEqual(get.call_count, calls)
+        self.assertEqual(second, first)
+        logger.info("✅ Second lookup served from cache (%s HTTP calls total)", get.call_count)
 
 
 class DummyUserGenerator:
@@ -274,28 +426,33 @@ class DummyUserGenerator:
             ('julia_child', 'Julia', 'Child'),
         ]
         
+        selected = dummy_data[:count]
+        existing = set(
+            User.objects.filter(username__in=[u[0] for u in selected])
+            .values_list('username', flat=True)
+        )
+        
         created_users = []
-        for i in range(min(count, len(dummy_data))):
-            username, first_name, last_name = dummy_data[i]
-            
-            user, created = User.objects.get_or_create(
-                username=username,
-                defaults={
-                    'first_name': first_name,
-                    'last_name': last_name,
-                    'password': 'student123'  # Note: Use set_password in production
-                }
-            )
-            
-            if created:
-                user.set_password('student123')
-                user.save()
-                print(f"✅ Created: {username} ({first_name} {last_name})")
-                created_users.append(user)
-            else:
+        for username, first_name, last_name in selected:
+            if username in existing:
                 print(f"⚠️ Already exists: {username}")
+            else:
+                created_users.append(User(
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name
+                ))
+                print(f"✅ Created: {username} ({first_name} {last_name})")
+        
+        if not created_users:
+            return []
         
-        return created_users
+        # Every dummy user shares the password, so hash it once (and not at
+        # all when nothing needs creating)
+        password = make_password('student123')
+        for user in created_users:
+            user.password = password
+        return User.objects.bulk_create(created_users)
     
     @staticmethod
     def create_dummy_books(count=5):
@@ -315,39 +472,50 @@ class DummyUserGenerator:
             ("Business Strategy", "MBA Expert", "BUS010", 350),
         ]
         
+        selected = books_data[:count]
+        existing = set(
+            Book.objects.filter(isbn__in=[b[2] for b in selected])
+            .values_list('isbn', flat=True)
+        )
+        
         created_books = []
-        for i in range(min(count, len(books_data))):
-            title, author, isbn, pages = books_data[i]
+        for title, author, isbn, pages in selected:
             monthly_fee = Decimal(str(pages / 100))
             
-            book, created = Book.objects.get_or_create(
-                isbn=isbn,
-                defaults={
-                    'title': title,
-                    'author': author,
-                    'number_of_pages': pages
-                }
-            )
-            
-            if created:
-                print(f"✅ Created: {title} ({pages} pages, ${monthly_fee}/month)")
-                created_books.append(book)
-            else:
+            if isbn in existing:
                 print(f"⚠️ Already exists: {title}")
+            else:
+                created_books.append(Book(
+                    title=title,
+                    author=author,
+                    isbn=isbn,
+                    number_of_pages=pages
+                ))
+                print(f"✅ Created: {title} ({pages} pages, ${monthly_fee}/month)")
         
-        return created_books
+        return Book.objects.bulk_create(created_books)
 
 
-def run_all_tests():
-    """Run all scenario tests"""
+def run_all_tests(verbosity=2):
+    """Run all scenario tests; scenario details are logged at verbosity 2+"""
+    logging.basicConfig(
+        level=logging.INFO if verbosity >= 2 else logging.WARNING,
+        format='%(message)s',
+    )
+    
     print("=" * 80)
     print("🧪 BOOK RENTAL SYSTEM - COMPREHENSIVE SCENARIO TESTS")
     print("=" * 80)
     
-    from django.test.runner import DiscoverRunner
+    from django.test.runner import DiscoverRunner, get_max_test_processes
     
-    test_runner = DiscoverRunner(verbosity=2)
-    failures = test_runner.run_tests(['__main__.ScenarioTestCase'])
+    # Test classes are spread over one process per core, each with its own
+    # copy of the test database; a class's tests stay on one worker
+    test_runner = DiscoverRunner(verbosity=verbosity, parallel=get_max_test_processes())
+    failures = test_runner.run_tests([
+        '__main__.ScenarioTestCase',
+        '__main__.OpenLibraryScenarioTestCase',
+    ])
     
     print("\n" + "=" * 80)
     if failures:
@@ -399,6 +567,9 @@ if __name__ == '__main__':
         count = int(sys.argv[2]) if len(sys.argv) > 2 else 5
         generator = DummyUserGenerator()
         generator.create_dummy_books(count)
+    elif len(sys.argv) > 1 and sys.argv[1] in ('-q', '--quiet'):
+        # Run all tests without the per-scenario details
+        run_all_tests(verbosity=1)
     else:
         # Run all tests
         run_all_tests()